@@ -1,79 +1,110 @@
 #!/usr/bin/env python3
 import re
-import ipaddress
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox, ttk
+import html
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import textwrap
 from requests.adapters import HTTPAdapter
+import urllib3
 from urllib3.util.retry import Retry
 import os
 import threading
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# URL 存活检测的最大并发线程数
+MAX_WORKERS = 64
+
+# 默认不校验证书，关闭 urllib3 对每个请求都输出的不安全请求警告
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# 所有检测共用同一个会话，复用连接池；连接池大小不小于并发线程数
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'})
+
+# 只读取响应前 64KB 并从中查找标题，无需下载和解析整个页面
+TITLE_SCAN_BYTES = 65536
+# 连接超时与读取超时（秒）
+REQUEST_TIMEOUT = (5, 10)
+_TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.I | re.S)
+_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
 
 ##########################
 # 文本提取与IP/URL提取功能
 ##########################
+_URL_PATTERN = r'https?://[^\s，、,]+'
+_IP_PATTERN = r'(?<!\d)\d{1,3}(?:\.\d{1,3}){3}(?!\d)'
+# 域名标签必须从字符边界开始匹配，避免在长字母数字串中逐位回溯（最坏情况为平方级）
+_DOMAIN_PATTERN = r'(?<!://)(?<![0-9\.])(?:www\.)?(?<![a-zA-Z0-9-])[a-zA-Z0-9-]+\.(?:com|net|org|cn|cc|io|gov|edu)(?:\.[a-zA-Z]{2,})?'
+# IP 后紧跟的端口信息（prot:80 / port:80），以前瞻方式捕获，不消耗文本；
+# 间隔只允许至多 20 个非单词字符，不会越过其他 IP 取到别的地址的端口
+_PORT_LOOKAHEAD = r'(?:(?=[^\w]{0,20}?(?i:prot|port)[:：]\s*(?P<port>\d+))|)'
+# 三类目标合并为一个正则，单次扫描文本，按命中的分组区分
+_EXTRACT_RE = re.compile(
+    '(?P<url>{})|(?P<ip>{}){}|(?P<domain>{})'.format(_URL_PATTERN, _IP_PATTERN, _PORT_LOOKAHEAD, _DOMAIN_PATTERN)
+)
+
+# 严格匹配 0-255 的八位组（不含前导零），常见的小数值放在分支最前面
+_OCTET = r'(?:[1-9]?\d|1\d\d|2[0-4]\d|25[0-5])'
+# 前后不能紧接数字或“.数字”，避免从 1.2.3.4.5 这类更长的点分数字中截取
+_IP_ALL_RE = re.compile(r'(?<!\d)(?<!\d\.)({0}(?:\.{0}){{3}})(?!\.?\d)'.format(_OCTET))
+
 def clean_result(item):
     """
     清理提取结果，去除尾部可能多余的符号
     """
     return item.rstrip('}"，,').strip()
 
+def normalize_url(url):
+    """
+    规范化 URL：协议与主机名转小写（用户名密码保持不变），去除路径末尾的 /；无法解析时原样返回
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    # 只转换主机部分，保留 user:password@ 中的大小写
+    userinfo, at, host = parts.netloc.rpartition('@')
+    netloc = userinfo + at + host.lower()
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip('/'), parts.query, parts.fragment))
+
 def extract_urls(text):
     """
     提取文本中所有 URL 信息：
      - 已带协议的 URL（http:// 或 https://）；
      - 带有 IP 地址和端口信息（如 prot:80 或 port:80）构造成 http://ip:port；
      - 未带协议的域名（如 www.xxx.com），自动补全为 https://
+    结果经 normalize_url 规范化后去重
     """
     extracted = set()
-    
-    
-    url_pattern = re.compile(r'(https?://[^\s，、,]+)')
-    for url in url_pattern.findall(text):
-        url = clean_result(url)
-        extracted.add(url)
-    
-    
-    ip_pattern = re.compile(r'(?:(?<!\d))(\d{1,3}(?:\.\d{1,3}){3})(?!\d)')
-    for match in re.finditer(ip_pattern, text):
-        ip = match.group(1)
-        following_text = text[match.end():match.end()+20]
-        port_match = re.search(r'(?:prot|port)[:：]\s*(\d+)', following_text, re.IGNORECASE)
-        if port_match:
-            port = port_match.group(1)
-            url = "http://{}:{}".format(ip, port)
+    for match in _EXTRACT_RE.finditer(text):
+        url, ip, port, domain = match.group('url', 'ip', 'port', 'domain')
+        if url:
+            extracted.add(normalize_url(clean_result(url)))
+        elif ip:
+            if port:
+                url = "http://{}:{}".format(ip, port)
+            else:
+                url = "http://{}".format(ip)
+            extracted.add(normalize_url(clean_result(url)))
         else:
-            url = "http://{}".format(ip)
-        url = clean_result(url)
-        extracted.add(url)
-        
-   
-    domain_pattern = re.compile(
-        r'(?<!://)(?<![0-9\.])((?:www\.)?[a-zA-Z0-9-]+\.(?:com|net|org|cn|cc|io|gov|edu)(?:\.[a-zA-Z]{2,})?)'
-    )
-    for domain in domain_pattern.findall(text):
-        domain = clean_result(domain)
-        extracted.add("https://{}".format(domain))
-        
+            extracted.add(normalize_url("https://{}".format(clean_result(domain))))
     return list(extracted)
 
 def extract_all_ips(text):
     """
     提取文本中的所有合法 IPv4 地址
     """
-    pattern = re.compile(r'(\d{1,3}(?:\.\d{1,3}){3})')
-    candidates = pattern.findall(text)
-    valid_ips = set()
-    for ip in candidates:
-        try:
-            candidate_ip = ipaddress.IPv4Address(ip)
-            valid_ips.add(str(candidate_ip))
-        except Exception:
-            continue
-    return list(valid_ips)
+    return list(set(_IP_ALL_RE.findall(text)))
 
 
 class ModeSelectionDialog(simpledialog.Dialog):
@@ -94,51 +125,76 @@ class ModeSelectionDialog(simpledialog.Dialog):
         self.result = "ip" if value == 0 else "url"
 
 
-def check_url_status(url):
+def parse_title(content, encoding=None):
+    """
+    从网页原始字节中提取标题；未指定编码时依次尝试 meta charset 与 utf-8
+    """
+    match = _TITLE_RE.search(content)
+    if not match:
+        return 'null'
+    if not encoding:
+        charset_match = _CHARSET_RE.search(content)
+        encoding = charset_match.group(1).decode('ascii') if charset_match else 'utf-8'
+    try:
+        title = match.group(1).decode(encoding, errors='replace')
+    except LookupError:
+        title = match.group(1).decode('utf-8', errors='replace')
+    # 与浏览器显示一致，将标题内的连续空白合并为一个空格
+    title = ' '.join(html.unescape(title).split())
+    return title if title else 'null'
+
+@lru_cache(maxsize=4096)
+def check_url_status(url, verify=False):
     """
-    检测 URL 存活状态，返回 (状态码, 网页标题)
+    检测 URL 存活状态，返回 (状态码, 网页标题)；verify 为 True 时校验 HTTPS 证书
     """
     try:
-        session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        session.mount('https://', HTTPAdapter(max_retries=retries))
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = session.get(url, timeout=10, verify=False, headers=headers)
-        response.encoding = response.apparent_encoding
-        status_code = response.status_code
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title = soup.title.string if soup.title and soup.title.string else 'null'
+        with _SESSION.get(url, timeout=REQUEST_TIMEOUT, verify=verify, stream=True) as response:
+            status_code = response.status_code
+            # 仅当响应头声明了 charset 时才采用 requests 给出的编码
+            encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+            content = response.raw.read(TITLE_SCAN_BYTES, decode_content=True)
+        title = parse_title(content, encoding)
         return status_code, title
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
         return 'Error', str(e)
 
 def wrap_text(text, width=80):
     """
-    自动换行处理文本
+    自动换行处理文本：按固定宽度切分，不做分词
     """
     if text is None:
         return 'null'
-    return "\n".join(textwrap.wrap(text, width))
+    text = str(text)
+    if len(text) <= width:
+        return text
+    return "\n".join(text[i:i + width] for i in range(0, len(text), width))
 
-def check_urls_list(urls, progress_callback):
+def check_urls_list(urls, progress_callback, verify=False):
     """
     对传入的 URL 列表进行存活检测，并生成检测结果 DataFrame
     """
-    results = []
-    total = len(urls)
-    for index, url in enumerate(urls):
-        
-        if not url.startswith(('http://', 'https://')):
-            url = 'http://' + url
-        status_code, title = check_url_status(url)
-        results.append([url, status_code, wrap_text(title)])
-        progress_callback(index + 1, total)
-    df = pd.DataFrame(results, columns=['URL', 'Status Code', 'Title'])
+    urls_norm = [url if url.startswith(('http://', 'https://')) else 'http://' + url for url in urls]
+    # 规范化后去重，相同地址只检测一次
+    urls_norm = list(dict.fromkeys(normalize_url(url) for url in urls_norm))
+    # 按列收集结果，最后一次性构造 DataFrame
+    urls_out, codes, titles = [], [], []
+    total = len(urls_norm)
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, total))) as executor:
+        futures = {executor.submit(check_url_status, url, verify): url for url in urls_norm}
+        # 结果只在当前线程中收集，无需加锁
+        for done, future in enumerate(as_completed(futures), 1):
+            status_code, title = future.result()
+            urls_out.append(futures[future])
+            codes.append(status_code)
+            titles.append(wrap_text(title))
+            progress_callback(done, total)
+    df = pd.DataFrame({'URL': urls_out, 'Status Code': codes, 'Title': titles})
     return df
 
 def get_unique_filename(base_filename):
     """
-    自动生成不重复的文件名（用于保存 Excel 结果）
+    自动生成不重复的文件名（用于保存检测结果）
     """
     i = 1
     file_name, file_extension = os.path.splitext(base_filename)
@@ -148,25 +204,31 @@ def get_unique_filename(base_filename):
         i += 1
     return unique_filename
 
-def save_results_to_excel(df):
+def save_results(df):
     """
-    弹窗选择保存目录，将结果 DataFrame 保存为 Excel 文件
+    弹窗选择保存目录，将结果 DataFrame 保存为 Excel 或 CSV 文件
     """
     output_directory = filedialog.askdirectory(title="选择保存目录")
     if not output_directory:
         messagebox.showerror("错误", "未选择目录，操作取消。")
         return
-    base_filename = os.path.join(output_directory, "检测结果.xlsx")
+    use_csv = messagebox.askyesno("保存格式", "是否快速保存为 CSV？\n选择“是”保存为 CSV（速度更快），选择“否”保存为 Excel。")
+    base_filename = os.path.join(output_directory, "检测结果.csv" if use_csv else "检测结果.xlsx")
     unique_filename = get_unique_filename(base_filename)
     try:
-        df.to_excel(unique_filename, index=False, engine='openpyxl')
+        if use_csv:
+            # utf-8-sig 便于 Excel 正确识别中文
+            df.to_csv(unique_filename, index=False, encoding='utf-8-sig')
+        else:
+            # 不指定引擎：已安装 xlsxwriter 时 pandas 优先使用它（写入更快），否则使用 openpyxl
+            df.to_excel(unique_filename, index=False)
         messagebox.showinfo("成功", f"结果已保存到: {unique_filename}")
     except Exception as e:
         messagebox.showerror("错误", f"保存文件失败: {str(e)}")
 
-def run_url_check_gui(urls, parent):
+def run_url_check_gui(urls, parent, verify=False):
     """
-    新建一个窗口，显示 URL 检测进度，检测完成后保存结果到 Excel
+    新建一个窗口，显示 URL 检测进度，检测完成后保存结果到 Excel 或 CSV；verify 为 True 时校验 HTTPS 证书
     """
     progress_window = tk.Toplevel(parent)
     progress_window.title("URL 存活检测")
@@ -180,13 +242,23 @@ def run_url_check_gui(urls, parent):
     def update_progress(current, total):
         progress_bar["value"] = (current / total) * 100
         progress_percentage.config(text=f"{int((current / total) * 100)}%")
-        progress_window.update_idletasks()
+
+    last_shown = 0
+
+    def schedule_progress(current, total):
+        # 每推进约 1% 才刷新一次，避免大量 URL 完成时频繁重绘
+        nonlocal last_shown
+        if current < total and current - last_shown < max(1, total // 100):
+            return
+        last_shown = current
+        # 工作线程不直接操作控件，交由 Tk 主循环执行
+        progress_window.after(0, update_progress, current, total)
 
     def run_check():
         try:
-            df = check_urls_list(urls, update_progress)
+            df = check_urls_list(urls, schedule_progress, verify)
             progress_window.destroy()  
-            save_results_to_excel(df)
+            save_results(df)
         except Exception as e:
             messagebox.showerror("错误", f"检测过程中发生异常: {str(e)}")
             progress_window.destroy()
@@ -208,8 +280,9 @@ def main():
         return
 
     try:
-        with open(input_filepath, "r", encoding="utf-8") as infile:
-            input_text = infile.read()
+        # 以二进制一次性读入后整体解码，省去逐行换行转换的开销
+        with open(input_filepath, "rb") as infile:
+            input_text = infile.read().decode("utf-8", errors="replace")
     except Exception as e:
         messagebox.showerror("错误", f"读取文件失败: {str(e)}")
         return
@@ -247,10 +320,10 @@ def main():
             return
 
         
-        if messagebox.askyesno("URL 存活检测", "是否进行 URL 存活检测？\n选择“是”将检测 URL 存活状态并保存检测结果为 Excel，选择“否”直接保存提取的 URL。"):
-            
+        if messagebox.askyesno("URL 存活检测", "是否进行 URL 存活检测？\n选择“是”将检测 URL 存活状态并保存检测结果（Excel 或 CSV），选择“否”直接保存提取的 URL。"):
+            verify = messagebox.askyesno("证书校验", "是否校验 HTTPS 证书？\n选择“是”将校验证书（无效证书的站点会检测失败），选择“否”不校验。", default=messagebox.NO)
             root.deiconify()  
-            run_url_check_gui(urls, root)
+            run_url_check_gui(urls, root, verify)
             root.mainloop()  
         else:
             